@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fatSecretProxy.settings')
 
 application = get_asgi_application()
+
+# Pre-open upstream connections, fetch the FatSecret token and warm the cache; /ready reports when done
+from fatsecret_proxy.warmup import start_warmup  # noqa: E402
+
+start_warmup()
@@ -52,6 +52,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'fatsecret_proxy.admission_control.AdmissionControlMiddleware',  # Priority load shedding
+    'fatsecret_proxy.traffic_capture.TrafficCaptureMiddleware',  # Only active when TRAFFIC_CAPTURE_FILE is set
 ]
 
 ROOT_URLCONF = 'fatSecretProxy.urls'
@@ -86,6 +88,21 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# FatSecret responses are cached here; see fatsecret_proxy/fatsecret_cache.py
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'fatsecret-proxy',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
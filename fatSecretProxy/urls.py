@@ -15,9 +15,11 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
+from fatsecret_proxy.readiness_view import readiness
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('fatsecret_proxy.urls')),  # Include proxy app routes
+    re_path(r'^ready/?$', readiness, name='readiness'),  # Load balancer readiness probe
 ]
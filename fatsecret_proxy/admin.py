@@ -1,3 +1,11 @@
 from django.contrib import admin
+from .models import ProfileUpdateJob
 
 # Register your models here.
+
+@admin.register(ProfileUpdateJob)
+class ProfileUpdateJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "status", "attempts", "response_status", "created_at", "updated_at")
+    list_filter = ("status",)
+    readonly_fields = ("created_at", "updated_at")
+    exclude = ("form_data", "photo")  # Member data stays out of the admin
@@ -0,0 +1,246 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+import logging
+from collections import Counter
+from django.http import JsonResponse
+from dotenv import load_dotenv
+
+# ✅ Load environment variables
+load_dotenv()
+
+# ✅ Admission limits (per worker process)
+# Requests queue here while holding a server thread, so the limit only has an effect when it is
+# below the worker's thread count; ADMISSION_SERVER_THREADS enforces that when set
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "32"))
+ADMISSION_SERVER_THREADS = int(os.getenv("ADMISSION_SERVER_THREADS", "0"))  # e.g. gunicorn --threads; 0 = unknown
+ADMISSION_TARGET_QUEUE_DELAY_MS = int(os.getenv("ADMISSION_TARGET_QUEUE_DELAY_MS", "100"))  # Low priority is shed past this
+ADMISSION_MAX_QUEUE_DELAY_MS = int(os.getenv("ADMISSION_MAX_QUEUE_DELAY_MS", "5000"))  # Normal priority is shed past this
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "2"))
+
+# ✅ Priority classes (lower rank is served first)
+PRIORITY_CRITICAL = "critical"
+PRIORITY_NORMAL = "normal"
+PRIORITY_LOW = "low"
+
+PRIORITY_RANKS = {
+    PRIORITY_CRITICAL: 0,
+    PRIORITY_NORMAL: 1,
+    PRIORITY_LOW: 2,
+}
+
+# ✅ Route priorities keyed by URL name (see fatsecret_proxy/urls.py)
+ROUTE_PRIORITIES = {
+    # Door access and logins never queue
+    "gatekeeper_proxy": PRIORITY_CRITICAL,
+    "login_with_email": PRIORITY_CRITICAL,
+    "login_with_memberid": PRIORITY_CRITICAL,
+    "admission_metrics": PRIORITY_CRITICAL,
+    "readiness": PRIORITY_CRITICAL,
+
+    "get_access_token": PRIORITY_NORMAL,
+    "signup_member": PRIORITY_NORMAL,
+    "update_member_profile": PRIORITY_NORMAL,
+    "update_member_profile_status": PRIORITY_NORMAL,
+    "gymmaster_proxy": PRIORITY_NORMAL,
+
+    # Bulk food searches are shed first
+    "fatsecret_proxy": PRIORITY_LOW,
+}
+DEFAULT_PRIORITY = PRIORITY_NORMAL
+
+# ✅ Setup logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+if ADMISSION_SERVER_THREADS and ADMISSION_MAX_CONCURRENT >= ADMISSION_SERVER_THREADS:
+    logger.warning(
+        "🚦 ADMISSION_MAX_CONCURRENT (%d) must be below ADMISSION_SERVER_THREADS (%d); using %d",
+        ADMISSION_MAX_CONCURRENT, ADMISSION_SERVER_THREADS, max(1, ADMISSION_SERVER_THREADS - 1),
+    )
+    ADMISSION_MAX_CONCURRENT = max(1, ADMISSION_SERVER_THREADS - 1)
+
+
+def front_end_queue_delay(request):
+    """
+    Returns seconds the request waited before reaching a server thread, from the
+    X-Request-Start header set by the load balancer or reverse proxy ("t=<epoch>" in
+    seconds, milliseconds or microseconds). Returns 0.0 when the header is absent or unusable.
+    """
+    header = request.headers.get("X-Request-Start", "")
+    try:
+        started = float(header.strip().removeprefix("t="))
+    except ValueError:
+        return 0.0
+
+    # ✅ Scale milliseconds and microseconds down to seconds by magnitude
+    while started > 1e11:
+        started /= 1000
+
+    # A missing or skewed clock gives a negative delay; treat it as no delay
+    return max(0.0, time.time() - started)
+
+
+class _Waiter:
+    def __init__(self):
+        self.event = threading.Event()
+        self.granted = False
+        self.cancelled = False
+        self.enqueued_at = time.monotonic()
+
+
+class AdmissionController:
+    """
+    Bounds in-flight requests and hands free slots to the highest-priority waiter first.
+    Critical requests are always admitted; others wait up to their class's queue-delay budget.
+    """
+
+    def __init__(self, max_concurrent):
+        self.max_concurrent = max_concurrent
+        self.in_flight = 0
+        self._queue = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+        self.admitted = Counter()
+        self.shed = Counter()
+        self.shed_by_route = Counter()
+        self.queue_ms_total = Counter()
+        self.queue_ms_max = Counter()
+
+    def _max_queue_delay(self, priority):
+        if priority == PRIORITY_LOW:
+            return ADMISSION_TARGET_QUEUE_DELAY_MS / 1000
+        return ADMISSION_MAX_QUEUE_DELAY_MS / 1000
+
+    def _oldest_queue_delay(self):
+        # ✅ The heap is ordered by priority, not age, so scan every live waiter
+        enqueued = [waiter.enqueued_at for _, _, waiter in self._queue if not waiter.cancelled]
+        if not enqueued:
+            return 0.0
+        return time.monotonic() - min(enqueued)
+
+    def _record_admit(self, priority, queued_seconds):
+        queued_ms = queued_seconds * 1000
+        self.admitted[priority] += 1
+        self.queue_ms_total[priority] += queued_ms
+        self.queue_ms_max[priority] = max(self.queue_ms_max[priority], queued_ms)
+
+    def _record_shed(self, priority, route_name, reason):
+        self.shed[priority] += 1
+        self.shed_by_route[route_name] += 1
+        logger.warning("🚦 Shed %s request to %s (%s)", priority, route_name, reason)
+
+    def acquire(self, priority, route_name, front_end_delay=0.0):
+        """
+        Returns True once a slot is held, or False if the request was shed.
+        front_end_delay (seconds already spent queued before the server thread) counts
+        against the class's queue-delay budget.
+        """
+        with self._lock:
+            if priority == PRIORITY_CRITICAL:
+                self.in_flight += 1
+                self._record_admit(priority, front_end_delay)
+                return True
+
+            # ✅ Requests that already waited out their budget upstream of the worker are shed
+            # even when a slot is free, since the client has most likely given up
+            budget = self._max_queue_delay(priority) - front_end_delay
+            if budget <= 0:
+                self._record_shed(priority, route_name, "front-end queue delay above target")
+                return False
+
+            if not self._queue and self.in_flight < self.max_concurrent:
+                self.in_flight += 1
+                self._record_admit(priority, front_end_delay)
+                return True
+
+            # ✅ Fail fast when the queue is already past the low-priority target
+            if priority == PRIORITY_LOW and self._oldest_queue_delay() > self._max_queue_delay(priority):
+                self._record_shed(priority, route_name, "queue delay above target")
+                return False
+
+            waiter = _Waiter()
+            heapq.heappush(self._queue, (PRIORITY_RANKS[priority], next(self._sequence), waiter))
+            self._dispatch()
+
+        waiter.event.wait(budget)
+
+        with self._lock:
+            if waiter.granted:
+                self._record_admit(priority, front_end_delay + time.monotonic() - waiter.enqueued_at)
+                return True
+            waiter.cancelled = True
+            self._record_shed(priority, route_name, "queue timeout")
+            return False
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+            self._dispatch()
+
+    def _dispatch(self):
+        # ✅ Caller holds the lock; hand free slots to the best waiters
+        while self._queue and self.in_flight < self.max_concurrent:
+            _, _, waiter = heapq.heappop(self._queue)
+            if waiter.cancelled:
+                continue
+            waiter.granted = True
+            self.in_flight += 1
+            waiter.event.set()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "in_flight": self.in_flight,
+                "queued": sum(1 for _, _, waiter in self._queue if not waiter.cancelled),
+                "target_queue_delay_ms": ADMISSION_TARGET_QUEUE_DELAY_MS,
+                "priorities": {
+                    priority: {
+                        "admitted": self.admitted[priority],
+                        "shed": self.shed[priority],
+                        "avg_queue_ms": round(self.queue_ms_total[priority] / self.admitted[priority], 2)
+                        if self.admitted[priority] else 0.0,
+                        "max_queue_ms": round(self.queue_ms_max[priority], 2),
+                    }
+                    for priority in PRIORITY_RANKS
+                },
+                "shed_by_route": dict(self.shed_by_route),
+            }
+
+
+admission_controller = AdmissionController(ADMISSION_MAX_CONCURRENT)
+
+
+class AdmissionControlMiddleware:
+    """
+    Applies route-level priority admission control before proxy views run.
+    Shed requests get 503 with a Retry-After header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            if getattr(request, "_admission_slot_held", False):
+                admission_controller.release()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        route_name = request.resolver_match.url_name if request.resolver_match else None
+        if not route_name:
+            return None
+
+        priority = ROUTE_PRIORITIES.get(route_name, DEFAULT_PRIORITY)
+        if not admission_controller.acquire(priority, route_name, front_end_queue_delay(request)):
+            response = JsonResponse({"error": "Server overloaded, retry later"}, status=503)
+            response["Retry-After"] = str(ADMISSION_RETRY_AFTER_SECONDS)
+            return response
+
+        request._admission_slot_held = True
+        return None
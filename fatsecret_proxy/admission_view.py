@@ -0,0 +1,17 @@
+import logging
+from django.http import JsonResponse
+from .admission_control import admission_controller
+
+# ✅ Setup logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+def admission_metrics(request):
+    """
+    Reports admitted/shed counts and queue delays per priority class for this worker.
+    """
+    if request.method != "GET":
+        logger.warning("🚨 Invalid request method: %s", request.method)
+        return JsonResponse({"error": "Only GET requests are allowed"}, status=405)
+
+    return JsonResponse(admission_controller.snapshot())
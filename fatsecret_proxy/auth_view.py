@@ -1,10 +1,14 @@
 import requests
 import os
+import threading
+import time
 import base64
 import logging  # ✅ Import logging module
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from dotenv import load_dotenv
+from . import upstream
+from .response_encoding import proxy_response
 
 # ✅ Load environment variables
 load_dotenv()
@@ -12,25 +16,22 @@ load_dotenv()
 FATSECRET_OAUTH_URL = "https://oauth.fatsecret.com/connect/token"
 CLIENT_ID = os.getenv("CLIENT_ID")
 CLIENT_SECRET = os.getenv("CLIENT_SECRET")
+FATSECRET_TOKEN_EXPIRY_MARGIN = int(os.getenv("FATSECRET_TOKEN_EXPIRY_MARGIN", "300"))  # Seconds
 
 # ✅ Setup logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-@csrf_exempt
-def get_access_token(request):
+# ✅ Client-credentials tokens are app-wide, so one token is shared until shortly before it expires
+_token_lock = threading.Lock()
+_cached_token = None
+_cached_token_expires_at = 0.0
+
+def request_access_token():
     """
-    Fetches an OAuth access token from FatSecret and logs request details.
+    Requests a client-credentials token from FatSecret and returns the raw response.
+    Raises requests.exceptions.RequestException on network failures.
     """
-    if request.method != "POST":
-        logger.warning("🚨 Invalid request method: %s", request.method)
-        return JsonResponse({"error": "Only POST requests are allowed"}, status=405)
-
-    # ✅ Log client ID & Secret presence (without printing actual values)
-    if not CLIENT_ID or not CLIENT_SECRET:
-        logger.error("🚨 Missing FATSECRET_CLIENT_ID or FATSECRET_CLIENT_SECRET")
-        return JsonResponse({"error": "Server misconfiguration: Missing credentials"}, status=500)
-
     # ✅ Create Basic Auth Header
     auth_string = f"{CLIENT_ID}:{CLIENT_SECRET}"
     auth_encoded = base64.b64encode(auth_string.encode()).decode()
@@ -49,9 +50,87 @@ def get_access_token(request):
     logger.debug("📝 Headers: %s", headers)
     logger.debug("📦 Payload: %s", data)
 
+    # ✅ Make request to FatSecret OAuth server
+    return upstream.session.post(FATSECRET_OAUTH_URL, headers=headers, data=data)
+
+
+def cached_token_payload():
+    """
+    Returns the cached token payload with `expires_in` adjusted to the time left, or None.
+    """
+    with _token_lock:
+        remaining = _cached_token_expires_at - time.monotonic()
+        if _cached_token is None or remaining <= 0:
+            return None
+        payload = dict(_cached_token)
+        payload["expires_in"] = int(remaining)
+        return payload
+
+
+def store_token(payload):
+    global _cached_token, _cached_token_expires_at
+    expires_in = int(payload.get("expires_in", 0)) - FATSECRET_TOKEN_EXPIRY_MARGIN
+    if expires_in <= 0:
+        return
+    with _token_lock:
+        _cached_token = payload
+        _cached_token_expires_at = time.monotonic() + expires_in
+
+
+def clear_cached_token():
+    global _cached_token, _cached_token_expires_at
+    with _token_lock:
+        _cached_token = None
+        _cached_token_expires_at = 0.0
+
+
+def prefetch_access_token():
+    """
+    Fetches and caches a token ahead of the first client request. Returns True on success.
+    """
+    if not CLIENT_ID or not CLIENT_SECRET:
+        logger.warning("🚨 Missing CLIENT_ID or CLIENT_SECRET; skipping token prefetch")
+        return False
+
+    # ✅ Another request may have cached a token already
+    if cached_token_payload() is not None:
+        return True
+
+    try:
+        response = request_access_token()
+        if response.status_code != 200:
+            logger.error("🚨 FatSecret token prefetch failed: %d", response.status_code)
+            return False
+        store_token(response.json())
+        return True
+
+    except (requests.exceptions.RequestException, ValueError):
+        logger.exception("🚨 FatSecret token prefetch failed")
+        return False
+
+
+@csrf_exempt
+def get_access_token(request):
+    """
+    Fetches an OAuth access token from FatSecret and logs request details.
+    """
+    if request.method != "POST":
+        logger.warning("🚨 Invalid request method: %s", request.method)
+        return JsonResponse({"error": "Only POST requests are allowed"}, status=405)
+
+    # ✅ Log client ID & Secret presence (without printing actual values)
+    if not CLIENT_ID or not CLIENT_SECRET:
+        logger.error("🚨 Missing FATSECRET_CLIENT_ID or FATSECRET_CLIENT_SECRET")
+        return JsonResponse({"error": "Server misconfiguration: Missing credentials"}, status=500)
+
+    # ✅ Serve the shared token while it is still valid
+    cached_payload = cached_token_payload()
+    if cached_payload is not None:
+        logger.debug("⚡ Serving cached FatSecret access token")
+        return proxy_response(request, cached_payload)
+
     try:
-        # ✅ Make request to FatSecret OAuth server
-        response = requests.post(FATSECRET_OAUTH_URL, headers=headers, data=data)
+        response = request_access_token()
 
         # ✅ Log Response Status & Content
         logger.debug("📥 Response Status Code: %d", response.status_code)
@@ -66,7 +145,9 @@ def get_access_token(request):
                 "response": response.text
             }, status=response.status_code)
 
-        return JsonResponse(response.json(), safe=False)
+        payload = response.json()
+        store_token(payload)
+        return proxy_response(request, payload)
 
     except requests.exceptions.RequestException as e:
         logger.exception("🚨 Request to FatSecret failed")
@@ -0,0 +1,317 @@
+import atexit
+import fnmatch
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from dotenv import load_dotenv
+from . import upstream
+
+# ✅ Load environment variables
+load_dotenv()
+
+# ✅ Cache configuration
+FATSECRET_CACHE_TTL = int(os.getenv("FATSECRET_CACHE_TTL", "3600"))  # Seconds
+# Only public catalogue methods: the cache key ignores the caller's token, so user-scoped
+# methods such as food-entries or foods/favorites must never match
+FATSECRET_CACHEABLE_PATHS = tuple(
+    pattern.strip()
+    for pattern in os.getenv("FATSECRET_CACHEABLE_PATHS", "food/v*,foods/search/v*,recipe/v*,recipes/search/v*").split(",")
+    if pattern.strip()
+)
+
+# ✅ Popularity tracking & startup warming
+FATSECRET_POPULARITY_FILE = os.getenv(
+    "FATSECRET_POPULARITY_FILE", str(settings.BASE_DIR / "fatsecret_popularity.json")
+)
+FATSECRET_POPULARITY_MAX_ENTRIES = int(os.getenv("FATSECRET_POPULARITY_MAX_ENTRIES", "1000"))
+FATSECRET_POPULARITY_SAVE_INTERVAL = int(os.getenv("FATSECRET_POPULARITY_SAVE_INTERVAL", "60"))  # Seconds
+FATSECRET_WARM_TOP_N = int(os.getenv("FATSECRET_WARM_TOP_N", "50"))
+
+# ✅ Predictive prefetch of food.get for the top foods.search hits (0 disables it)
+FATSECRET_PREFETCH_TOP_N = int(os.getenv("FATSECRET_PREFETCH_TOP_N", "0"))
+FATSECRET_PREFETCH_MAX_PER_MINUTE = int(os.getenv("FATSECRET_PREFETCH_MAX_PER_MINUTE", "60"))
+FATSECRET_PREFETCH_FOOD_PATH = os.getenv("FATSECRET_PREFETCH_FOOD_PATH", "food/v4")
+
+# ✅ Setup logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+_popularity = Counter()
+_popularity_lock = threading.Lock()
+_popularity_loaded = False
+_last_saved_at = time.monotonic()
+
+# ✅ Prefetches and popularity saves run here, never on a request thread
+_background_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="fatsecret-background")
+_prefetch_lock = threading.Lock()
+_prefetch_window_start = time.monotonic()
+_prefetch_window_count = 0
+
+
+def _normalize_params(params):
+    """
+    Drops the forced `format` parameter and sorts the rest so equivalent requests share one key.
+    """
+    return tuple(sorted((key, value) for key, value in params.items() if key != "format"))
+
+
+def is_cacheable(method_path):
+    return any(fnmatch.fnmatchcase(method_path, pattern) for pattern in FATSECRET_CACHEABLE_PATHS)
+
+
+def is_error_payload(data):
+    """
+    FatSecret reports errors such as an invalid id or token as {"error": {...}} with HTTP 200.
+    """
+    return isinstance(data, dict) and "error" in data
+
+
+def cache_key(method_path, params):
+    raw = f"{method_path}?{urlencode(_normalize_params(params))}"
+    return "fatsecret:" + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def get_cached(method_path, params):
+    if not is_cacheable(method_path):
+        return None
+    return cache.get(cache_key(method_path, params))
+
+
+def store(method_path, params, data):
+    if is_cacheable(method_path) and not is_error_payload(data):
+        cache.set(cache_key(method_path, params), data, FATSECRET_CACHE_TTL)
+
+
+def _parse_popularity_entry(entry):
+    """
+    Returns ((method_path, params), hits) for a well-formed persisted entry, or None.
+    """
+    if not isinstance(entry, dict):
+        return None
+
+    method_path, params, hits = entry.get("method_path"), entry.get("params"), entry.get("hits")
+    if not isinstance(method_path, str) or not isinstance(params, list) or not isinstance(hits, int):
+        return None
+    if not all(
+        isinstance(pair, list) and len(pair) == 2 and all(isinstance(part, str) for part in pair)
+        for pair in params
+    ):
+        return None
+
+    return (method_path, tuple(tuple(pair) for pair in params)), hits
+
+
+def _load_popularity():
+    global _popularity_loaded
+    if _popularity_loaded:
+        return
+    _popularity_loaded = True
+
+    try:
+        with open(FATSECRET_POPULARITY_FILE) as fp:
+            entries = json.load(fp)
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError):
+        logger.exception("🚨 Could not read popularity file: %s", FATSECRET_POPULARITY_FILE)
+        return
+
+    if not isinstance(entries, list):
+        logger.warning("🚨 Ignoring popularity file with unexpected layout: %s", FATSECRET_POPULARITY_FILE)
+        return
+
+    skipped = 0
+    for entry in entries:
+        parsed = _parse_popularity_entry(entry)
+        if parsed is None:
+            skipped += 1
+            continue
+        key, hits = parsed
+        _popularity[key] += hits
+
+    if skipped:
+        logger.warning("🚨 Skipped %d malformed entries in %s", skipped, FATSECRET_POPULARITY_FILE)
+
+
+def save_popularity():
+    """
+    Persists the most popular request keys so the next deploy can warm its cache from them.
+    """
+    global _last_saved_at
+    with _popularity_lock:
+        _load_popularity()
+        entries = [
+            {"method_path": method_path, "params": [list(pair) for pair in params], "hits": hits}
+            for (method_path, params), hits in _popularity.most_common(FATSECRET_POPULARITY_MAX_ENTRIES)
+        ]
+        # ✅ Keep the in-memory counter bounded to what we persist
+        _popularity.clear()
+        for entry in entries:
+            _popularity[(entry["method_path"], tuple(tuple(pair) for pair in entry["params"]))] = entry["hits"]
+        _last_saved_at = time.monotonic()
+
+    # ✅ Written outside the lock to a per-save temp file, so requests never wait on disk
+    # and concurrent workers cannot interleave their writes before the atomic replace
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(FATSECRET_POPULARITY_FILE)), suffix=".tmp"
+        )
+        with os.fdopen(fd, "w") as fp:
+            json.dump(entries, fp)
+        os.replace(tmp_path, FATSECRET_POPULARITY_FILE)
+    except OSError:
+        logger.exception("🚨 Could not write popularity file: %s", FATSECRET_POPULARITY_FILE)
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+atexit.register(save_popularity)
+
+
+def record_hit(method_path, params):
+    if not is_cacheable(method_path):
+        return
+
+    global _last_saved_at
+    with _popularity_lock:
+        _load_popularity()
+        _popularity[(method_path, _normalize_params(params))] += 1
+        save_due = time.monotonic() - _last_saved_at >= FATSECRET_POPULARITY_SAVE_INTERVAL
+        if save_due:
+            _last_saved_at = time.monotonic()  # Only one save is scheduled per interval
+
+    if save_due:
+        _background_executor.submit(save_popularity)
+
+
+def top_entries(limit):
+    with _popularity_lock:
+        _load_popularity()
+        return [key for key, _ in _popularity.most_common(limit)]
+
+
+def _fetch_and_store(method_path, params, access_token):
+    """
+    Fetches a GET method from FatSecret and caches it when the upstream answers 200.
+    """
+    from .views import FATSECRET_BASE_URL
+
+    upstream_params = dict(params)
+    upstream_params["format"] = "json"
+    headers = {
+        "Authorization": access_token,
+        "Content-Type": "application/json",
+    }
+
+    response = upstream.session.get(f"{FATSECRET_BASE_URL}{method_path}", params=upstream_params, headers=headers, timeout=20)
+    if response.status_code != 200:
+        logger.warning("🚨 FatSecret warm-up fetch failed: %s %d", method_path, response.status_code)
+        return
+
+    data = response.json()
+    if is_error_payload(data):
+        logger.warning("🚨 FatSecret warm-up fetch returned an error: %s %s", method_path, data["error"])
+        return
+
+    store(method_path, params, data)
+
+
+def warm_cache():
+    """
+    Replays the most popular persisted requests against FatSecret to fill a cold cache.
+    """
+    from .auth_view import cached_token_payload, prefetch_access_token
+
+    entries = top_entries(FATSECRET_WARM_TOP_N)
+    if not entries:
+        logger.debug("💤 No popular FatSecret requests recorded; skipping cache warm-up")
+        return
+
+    token_payload = cached_token_payload()
+    if token_payload is None and prefetch_access_token():
+        token_payload = cached_token_payload()
+    if token_payload is None:
+        logger.error("🚨 Could not fetch token for cache warm-up")
+        return
+    access_token = f"Bearer {token_payload['access_token']}"
+
+    try:
+        warmed = 0
+        for method_path, params in entries:
+            params = dict(params)
+            if cache.get(cache_key(method_path, params)) is not None:
+                continue
+            _fetch_and_store(method_path, params, access_token)
+            warmed += 1
+
+        logger.info("🔥 Warmed %d of %d popular FatSecret requests", warmed, len(entries))
+
+    except (requests.exceptions.RequestException, ValueError):
+        logger.exception("🚨 FatSecret cache warm-up failed")
+
+
+def _take_prefetch_budget():
+    """
+    Fixed one-minute window limiting how many upstream calls prefetching may spend.
+    """
+    global _prefetch_window_start, _prefetch_window_count
+    with _prefetch_lock:
+        now = time.monotonic()
+        if now - _prefetch_window_start >= 60:
+            _prefetch_window_start = now
+            _prefetch_window_count = 0
+        if _prefetch_window_count >= FATSECRET_PREFETCH_MAX_PER_MINUTE:
+            return False
+        _prefetch_window_count += 1
+        return True
+
+
+def _search_result_food_ids(data):
+    """
+    Extracts food ids from a foods.search response (v1 `foods` or v2+ `foods_search` layout).
+    """
+    if not isinstance(data, dict):
+        return []
+
+    container = data.get("foods") or (data.get("foods_search") or {}).get("results") or {}
+    foods = container.get("food", []) if isinstance(container, dict) else []
+    if isinstance(foods, dict):  # FatSecret returns a bare object for single results
+        foods = [foods]
+
+    return [str(food["food_id"]) for food in foods if isinstance(food, dict) and "food_id" in food]
+
+
+def prefetch_search_results(method_path, data, access_token):
+    """
+    Queues background food.get fetches for the top hits of a foods.search response.
+    """
+    if FATSECRET_PREFETCH_TOP_N <= 0 or not method_path.startswith("foods/search"):
+        return
+
+    for food_id in _search_result_food_ids(data)[:FATSECRET_PREFETCH_TOP_N]:
+        params = {"food_id": food_id}
+        if cache.get(cache_key(FATSECRET_PREFETCH_FOOD_PATH, params)) is not None:
+            continue
+        if not _take_prefetch_budget():
+            logger.debug("⏳ FatSecret prefetch budget exhausted")
+            return
+        _background_executor.submit(_prefetch, params, access_token)
+
+
+def _prefetch(params, access_token):
+    try:
+        _fetch_and_store(FATSECRET_PREFETCH_FOOD_PATH, params, access_token)
+    except (requests.exceptions.RequestException, ValueError):
+        logger.exception("🚨 FatSecret prefetch failed: %s", params)
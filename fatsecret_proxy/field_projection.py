@@ -0,0 +1,98 @@
+import json
+import os
+import logging
+from functools import lru_cache
+from dotenv import load_dotenv
+
+# ✅ Load environment variables
+load_dotenv()
+
+# ✅ Setup logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# ✅ Named response profiles, e.g. {"food_card": ["food.food_name", "food.servings.serving.calories"]}
+FATSECRET_RESPONSE_PROFILES = json.loads(os.getenv("FATSECRET_RESPONSE_PROFILES", "{}"))
+
+# ✅ Limits on client-supplied field lists (projection recurses once per path segment)
+FIELD_PROJECTION_MAX_PATHS = int(os.getenv("FIELD_PROJECTION_MAX_PATHS", "50"))
+FIELD_PROJECTION_MAX_DEPTH = int(os.getenv("FIELD_PROJECTION_MAX_DEPTH", "8"))
+
+
+def _identity(value):
+    return value
+
+
+def _build_tree(paths):
+    """
+    Merges dotted field paths into a nested dict; None marks a field kept whole.
+    """
+    tree = {}
+    for path in paths:
+        node = tree
+        keys = [key for key in path.strip().split(".") if key]
+        for position, key in enumerate(keys):
+            if position == len(keys) - 1:
+                node[key] = None
+            elif node.get(key, {}) is None:
+                break  # A parent is already kept whole
+            else:
+                node = node.setdefault(key, {})
+    return tree
+
+
+def _compile_tree(tree):
+    if tree is None:
+        return _identity
+
+    children = [(key, _compile_tree(subtree)) for key, subtree in tree.items()]
+
+    def project(value):
+        # ✅ Lists are transparent so "food.servings.serving.calories" reaches every serving
+        if isinstance(value, list):
+            return [project(item) for item in value]
+        if isinstance(value, dict):
+            return {key: child(value[key]) for key, child in children if key in value}
+        return value
+
+    return project
+
+
+@lru_cache(maxsize=256)
+def compile_projection(fields):
+    """
+    Compiles a comma-separated list of dotted paths into a projection function.
+    Only the selected keys are copied; the upstream document is never deep-copied.
+    Raises ValueError when the list exceeds the path count or depth limits.
+    """
+    paths = [field for field in fields.split(",") if field.strip()]
+    if len(paths) > FIELD_PROJECTION_MAX_PATHS:
+        raise ValueError(f"At most {FIELD_PROJECTION_MAX_PATHS} fields may be requested")
+    if any(len(path.split(".")) > FIELD_PROJECTION_MAX_DEPTH for path in paths):
+        raise ValueError(f"Fields may be at most {FIELD_PROJECTION_MAX_DEPTH} levels deep")
+
+    tree = _build_tree(paths)
+    if not tree:
+        return _identity
+
+    project = _compile_tree(tree)
+
+    def project_unless_error(value):
+        # ✅ FatSecret error objects (sent with HTTP 200) pass through untouched
+        if isinstance(value, dict) and "error" in value:
+            return value
+        return project(value)
+
+    return project_unless_error
+
+
+def resolve_projection(fields=None, profile=None):
+    """
+    Returns the projection for an explicit `fields=` list or a named profile.
+    Raises KeyError for unknown profiles and ValueError for field lists over the limits.
+    """
+    if fields:
+        return compile_projection(fields)
+    if profile:
+        return compile_projection(",".join(FATSECRET_RESPONSE_PROFILES[profile]))
+    return None
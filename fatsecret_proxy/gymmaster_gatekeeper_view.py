@@ -5,6 +5,8 @@ import logging
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from dotenv import load_dotenv
+from . import upstream
+from .response_encoding import proxy_response
 from base64 import b64encode
 
 # ✅ Load environment variables
@@ -46,7 +48,7 @@ def gatekeeper_proxy(request, path):
     try:
         if request.method == "GET":
             # ✅ Forward GET request (pass query parameters)
-            response = requests.get(gymmaster_url, headers=headers, params=request.GET)
+            response = upstream.session.get(gymmaster_url, headers=headers, params=request.GET)
 
         elif request.method == "POST":
             # ✅ Ensure request contains JSON
@@ -57,7 +59,7 @@ def gatekeeper_proxy(request, path):
                 return JsonResponse({"error": "Invalid JSON format"}, status=400)
 
             # ✅ Forward POST request (pass JSON body)
-            response = requests.post(gymmaster_url, headers=headers, json=request_data)
+            response = upstream.session.post(gymmaster_url, headers=headers, json=request_data)
 
         else:
             return JsonResponse({"error": "Only GET and POST requests are allowed"}, status=405)
@@ -67,7 +69,7 @@ def gatekeeper_proxy(request, path):
         logger.debug("📄 GymMaster Response Content: %s", response.text)
 
         # ✅ Return GymMaster's JSON Response
-        return JsonResponse(response.json(), safe=False, status=response.status_code)
+        return proxy_response(request, response.json(), status=response.status_code)
 
     except requests.exceptions.RequestException as e:
         logger.exception("🚨 Request to GymMaster GateKeeper failed")
@@ -4,6 +4,8 @@ import logging
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from dotenv import load_dotenv
+from . import upstream
+from .response_encoding import proxy_response
 
 # ✅ Load environment variables
 load_dotenv()
@@ -49,7 +51,7 @@ def login_with_email(request):
         logger.debug("📤 Forwarding email login request to GymMaster: %s", GYMMASTER_LOGIN_URL)
         logger.debug("📝 Payload: %s", form_data)
 
-        response = requests.post(
+        response = upstream.session.post(
             GYMMASTER_LOGIN_URL,
             data=form_data,
             headers={"Content-Type": "application/x-www-form-urlencoded"},
@@ -59,7 +61,7 @@ def login_with_email(request):
         logger.debug("📥 GymMaster Response Status: %d", response.status_code)
         logger.debug("📄 GymMaster Response Content: %s", response.text)
 
-        return JsonResponse(response.json(), safe=False, status=response.status_code)
+        return proxy_response(request, response.json(), status=response.status_code)
 
     except requests.exceptions.RequestException as e:
         logger.exception("🚨 Request to GymMaster failed")
@@ -94,7 +96,7 @@ def login_with_memberid(request):
         logger.debug("📤 Forwarding member ID login request to GymMaster: %s", GYMMASTER_LOGIN_URL)
         logger.debug("📝 Payload: %s", form_data)
 
-        response = requests.post(
+        response = upstream.session.post(
             GYMMASTER_LOGIN_URL,
             data=form_data,
             headers={"Content-Type": "application/x-www-form-urlencoded"},
@@ -104,7 +106,7 @@ def login_with_memberid(request):
         logger.debug("📥 GymMaster Response Status: %d", response.status_code)
         logger.debug("📄 GymMaster Response Content: %s", response.text)
 
-        return JsonResponse(response.json(), safe=False, status=response.status_code)
+        return proxy_response(request, response.json(), status=response.status_code)
 
     except requests.exceptions.RequestException as e:
         logger.exception("🚨 Request to GymMaster failed")
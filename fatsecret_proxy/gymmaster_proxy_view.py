@@ -5,6 +5,8 @@ import logging
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from dotenv import load_dotenv
+from . import upstream
+from .response_encoding import proxy_response
 
 # ✅ Load environment variables
 load_dotenv()
@@ -38,7 +40,7 @@ def gymmaster_proxy(request, path):
             # ✅ Always append API key for GET
             params = request.GET.dict()
             params["api_key"] = GYMMASTER_API_KEY
-            response = requests.get(gymmaster_url, params=params)
+            response = upstream.session.get(gymmaster_url, params=params)
 
         elif request.method == "POST":
             headers = {}
@@ -55,7 +57,7 @@ def gymmaster_proxy(request, path):
 
                 logger.debug("📝 JSON Payload: %s", body_data)
 
-                response = requests.post(
+                response = upstream.session.post(
                     gymmaster_url,
                     json=body_data,
                     headers=headers,
@@ -70,7 +72,7 @@ def gymmaster_proxy(request, path):
 
                 logger.debug("📝 Form Payload: %s", form_data)
 
-                response = requests.post(
+                response = upstream.session.post(
                     gymmaster_url,
                     data=form_data,
                     headers=headers,
@@ -84,7 +86,7 @@ def gymmaster_proxy(request, path):
         logger.debug("📥 GymMaster Response Status: %d", response.status_code)
         logger.debug("📄 GymMaster Response Content: %s", response.text)
 
-        return JsonResponse(response.json(), safe=False, status=response.status_code)
+        return proxy_response(request, response.json(), status=response.status_code)
 
     except requests.exceptions.RequestException as e:
         logger.exception("🚨 Request to GymMaster failed.")
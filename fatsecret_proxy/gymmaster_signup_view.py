@@ -4,6 +4,8 @@ import logging
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from dotenv import load_dotenv
+from . import upstream
+from .response_encoding import proxy_response
 
 # ✅ Load environment variables
 load_dotenv()
@@ -46,7 +48,7 @@ def signup_member(request):
         logger.debug("📝 Form Data: %s", form_data)
 
         # ✅ Send Multipart request to GymMaster
-        response = requests.post(
+        response = upstream.session.post(
             GYMMASTER_SIGNUP_URL,
             data=form_data,  # Sending form fields
             files=files,  # Sending file(s)
@@ -58,7 +60,7 @@ def signup_member(request):
         logger.debug("📄 GymMaster Response Content: %s", response.text)
 
         # ✅ Return GymMaster's response to the mobile app
-        return JsonResponse(response.json(), safe=False, status=response.status_code)
+        return proxy_response(request, response.json(), status=response.status_code)
 
     except requests.exceptions.RequestException as e:
         logger.exception("🚨 Request to GymMaster failed")
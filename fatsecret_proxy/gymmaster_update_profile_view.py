@@ -2,8 +2,12 @@ import requests
 import os
 import logging
 from django.http import JsonResponse
+from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
 from dotenv import load_dotenv
+from . import profile_update_jobs, upstream
+from .models import ProfileUpdateJob
+from .response_encoding import proxy_response
 
 # ✅ Load environment variables
 load_dotenv()
@@ -12,10 +16,72 @@ load_dotenv()
 GYMMASTER_PROFILE_UPDATE_URL = "https://elitefitnessclub.gymmasteronline.com/portal/api/v1/member/profile"
 GYMMASTER_API_KEY = os.getenv("GYMMASTER_MEMBER_API_KEY")  # Member API Key
 
+# ✅ Async mode: accept with 202 and forward from a background worker (clients may also send "Prefer: respond-async")
+GYMMASTER_PROFILE_UPDATE_ASYNC = os.getenv("GYMMASTER_PROFILE_UPDATE_ASYNC", "false").lower() == "true"
+GYMMASTER_PROFILE_PHOTO_MAX_BYTES = int(os.getenv("GYMMASTER_PROFILE_PHOTO_MAX_BYTES", str(10 * 1024 * 1024)))
+
 # ✅ Setup logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+def forward_profile_update(form_data, files):
+    """
+    Sends a multipart profile update to GymMaster and returns the raw response.
+    Raises requests.exceptions.RequestException on network failures.
+    """
+    form_data = dict(form_data)
+    form_data["api_key"] = GYMMASTER_API_KEY
+
+    logger.debug("📤 Forwarding profile update request to GymMaster: %s", GYMMASTER_PROFILE_UPDATE_URL)
+    logger.debug("📝 Form Data: %s", form_data)
+
+    # ✅ Send Multipart request
+    response = upstream.session.post(
+        GYMMASTER_PROFILE_UPDATE_URL,
+        data=form_data,
+        files=files,
+        timeout=15
+    )
+
+    logger.debug("📥 GymMaster Response Status: %d", response.status_code)
+    logger.debug("📄 GymMaster Response Content: %s", response.text)
+
+    return response
+
+
+def _wants_async(request):
+    return GYMMASTER_PROFILE_UPDATE_ASYNC or "respond-async" in request.headers.get("Prefer", "").lower()
+
+
+def _accept_profile_update(request):
+    """
+    Validates and stores the update, queues it for a background worker and answers 202 right away.
+    """
+    form_data = request.POST.dict()
+    profile_photo = request.FILES.get("memberphoto")
+
+    if not form_data and profile_photo is None:
+        return JsonResponse({"error": "No profile fields provided"}, status=400)
+
+    if profile_photo is not None and profile_photo.size > GYMMASTER_PROFILE_PHOTO_MAX_BYTES:
+        logger.warning("🚨 Profile photo too large: %d bytes", profile_photo.size)
+        return JsonResponse({"error": "Profile photo is too large"}, status=413)
+
+    job = ProfileUpdateJob.objects.create(
+        form_data=form_data,
+        photo_name=profile_photo.name if profile_photo else "",
+        photo_content_type=(profile_photo.content_type or "") if profile_photo else "",
+        photo=profile_photo.read() if profile_photo else None,
+    )
+    profile_update_jobs.submit(job.id)
+    logger.debug("🕒 Queued profile update job %s", job.id)
+
+    status_url = request.build_absolute_uri(reverse("update_member_profile_status", args=[job.id]))
+    response = proxy_response(request, {"job_id": str(job.id), "status": job.status, "status_url": status_url}, status=202)
+    response["Location"] = status_url
+    return response
+
+
 @csrf_exempt
 def update_member_profile(request):
     """
@@ -30,10 +96,12 @@ def update_member_profile(request):
         logger.error("🚨 Missing GymMaster API Key")
         return JsonResponse({"error": "Server misconfiguration: Missing API Key"}, status=500)
 
+    if _wants_async(request):
+        return _accept_profile_update(request)
+
     try:
         # ✅ Extract form data
         form_data = request.POST.dict()
-        form_data["api_key"] = GYMMASTER_API_KEY
 
         # ✅ Handle profile photo upload
         files = {}
@@ -46,23 +114,43 @@ def update_member_profile(request):
             )
             logger.debug("🖼️ Updating Profile Photo: %s", profile_photo.name)
 
-        logger.debug("📤 Forwarding profile update request to GymMaster: %s", GYMMASTER_PROFILE_UPDATE_URL)
-        logger.debug("📝 Form Data: %s", form_data)
-
-        # ✅ Send Multipart request
-        response = requests.post(
-            GYMMASTER_PROFILE_UPDATE_URL,
-            data=form_data,
-            files=files,
-            timeout=15
-        )
+        response = forward_profile_update(form_data, files)
 
-        # ✅ Log and return response
-        logger.debug("📥 GymMaster Response Status: %d", response.status_code)
-        logger.debug("📄 GymMaster Response Content: %s", response.text)
-
-        return JsonResponse(response.json(), safe=False, status=response.status_code)
+        return proxy_response(request, response.json(), status=response.status_code)
 
     except requests.exceptions.RequestException as e:
         logger.exception("🚨 Request to GymMaster failed")
         return JsonResponse({"error": "Request failed", "details": str(e)}, status=500)
+
+
+def update_member_profile_status(request, job_id):
+    """
+    Reports the state of an async profile update and GymMaster's final response once it is done.
+    """
+    if request.method != "GET":
+        logger.warning("🚨 Invalid request method: %s", request.method)
+        return JsonResponse({"error": "Only GET requests are allowed"}, status=405)
+
+    # ✅ Expired jobs are gone, so their status reads as unknown
+    profile_update_jobs.purge_finished_jobs_if_due()
+
+    try:
+        job = ProfileUpdateJob.objects.get(pk=job_id)
+    except ProfileUpdateJob.DoesNotExist:
+        return JsonResponse({"error": "Unknown job"}, status=404)
+
+    # ✅ Polling recovers jobs whose worker died mid-flight
+    if profile_update_jobs.requeue_if_stale(job.id):
+        job.refresh_from_db()
+
+    payload = {
+        "job_id": str(job.id),
+        "status": job.status,
+        "attempts": job.attempts,
+    }
+    if job.status in (ProfileUpdateJob.STATUS_SUCCEEDED, ProfileUpdateJob.STATUS_FAILED):
+        payload["result"] = {"status_code": job.response_status, "response": job.response_body}
+        if job.error:
+            payload["error"] = job.error
+
+    return proxy_response(request, payload)
@@ -0,0 +1,94 @@
+import gzip
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from fatsecret_proxy import response_encoding
+
+
+def _sample_food_get(servings):
+    """
+    Builds a food.get-shaped document; FatSecret returns numbers as strings and repeats
+    every nutrient key per serving.
+    """
+    nutrients = [
+        "calcium", "calories", "carbohydrate", "cholesterol", "fat", "fiber", "iron",
+        "monounsaturated_fat", "polyunsaturated_fat", "potassium", "protein",
+        "saturated_fat", "sodium", "sugar", "trans_fat", "vitamin_a", "vitamin_c", "vitamin_d",
+    ]
+    return {
+        "food": {
+            "food_id": "33691",
+            "food_name": "Chicken Breast",
+            "food_type": "Generic",
+            "food_url": "https://www.fatsecret.com/calories-nutrition/generic/chicken-breast",
+            "servings": {
+                "serving": [
+                    {
+                        "serving_id": str(50000 + index),
+                        "serving_description": f"{index + 1} oz, boneless, cooked",
+                        "serving_url": f"https://www.fatsecret.com/calories-nutrition/generic/chicken-breast?portionid={50000 + index}",
+                        "metric_serving_amount": f"{28.35 * (index + 1):.3f}",
+                        "metric_serving_unit": "g",
+                        "number_of_units": "1.000",
+                        "measurement_description": "oz, boneless, cooked",
+                        **{name: f"{(index + 1) * (position + 0.37):.3f}" for position, name in enumerate(nutrients)},
+                    }
+                    for index in range(servings)
+                ]
+            },
+        }
+    }
+
+
+class Command(BaseCommand):
+    help = "Compares encode time and payload size of JSON, MessagePack and CBOR proxy responses."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--file", help="JSON document to encode (defaults to a synthetic food.get response)")
+        parser.add_argument("--servings", type=int, default=12, help="Servings in the synthetic food.get response")
+        parser.add_argument("--iterations", type=int, default=2000, help="Encodes per format")
+
+    def handle(self, *args, **options):
+        if options["file"]:
+            try:
+                with open(options["file"]) as fp:
+                    data = json.load(fp)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not load {options['file']}: {e}")
+        else:
+            data = _sample_food_get(options["servings"])
+
+        encoders = [
+            # JsonResponse serializes through DjangoJSONEncoder
+            ("json", lambda value: json.dumps(value, cls=DjangoJSONEncoder).encode()),
+        ]
+        if response_encoding.msgpack is not None:
+            encoders.append(("msgpack", response_encoding.encode_msgpack))
+        else:
+            self.stdout.write(self.style.WARNING("msgpack is not installed; skipping"))
+        if response_encoding.cbor2 is not None:
+            encoders.append(("cbor", response_encoding.encode_cbor))
+        else:
+            self.stdout.write(self.style.WARNING("cbor2 is not installed; skipping"))
+
+        iterations = options["iterations"]
+        results = []
+        for name, encode in encoders:
+            payload = encode(data)
+            started = time.perf_counter()
+            for _ in range(iterations):
+                encode(data)
+            encode_us = (time.perf_counter() - started) / iterations * 1_000_000
+            results.append((name, len(payload), len(gzip.compress(payload)), encode_us))
+
+        json_size = results[0][1]
+        json_us = results[0][3]
+        self.stdout.write(f"{'format':<10}{'bytes':>10}{'gzip bytes':>12}{'vs json':>10}{'encode us':>12}{'speedup':>10}")
+        for name, size, gzip_size, encode_us in results:
+            self.stdout.write(
+                f"{name:<10}{size:>10}{gzip_size:>12}{size / json_size:>9.0%} "
+                f"{encode_us:>11.1f}{json_us / encode_us:>9.2f}x"
+            )
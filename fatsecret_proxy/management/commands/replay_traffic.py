@@ -0,0 +1,246 @@
+import atexit
+import importlib
+import json
+import statistics
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from fatsecret_proxy import fatsecret_cache, gymmaster_update_profile_view, traffic_capture
+from fatsecret_proxy.auth_view import clear_cached_token
+from fatsecret_proxy.traffic_capture import REDACTED, read_capture, redact, redact_body, redact_url
+from fatsecret_proxy.upstream import UPSTREAM_URLS
+
+
+def _playback_key(method, path, query, body):
+    # ✅ Query pairs are sorted and bodies serialized with sorted keys, so only the request's
+    # content (already redacted on both sides) decides which recording answers it
+    return (
+        method,
+        path,
+        tuple(sorted(parse_qsl(query, keep_blank_values=True))),
+        json.dumps(body, sort_keys=True) if body is not None else None,
+    )
+
+
+class PlaybackServer(ThreadingHTTPServer):
+    """
+    Local stand-in for every upstream that answers each request with a recorded response to the
+    same method, path, query and body (in recorded order when repeated), after sleeping for the
+    recorded upstream latency. Requests with no matching recording are counted as misses.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, records, honor_latency):
+        super().__init__(("127.0.0.1", 0), PlaybackHandler)
+        self.honor_latency = honor_latency
+        self.lock = threading.Lock()
+        self.exchanges = defaultdict(deque)
+        self.misses = 0
+
+        for record in records:
+            for exchange in record["upstream"]:
+                # ✅ Upstream host becomes the first path segment so all upstreams share one server
+                parts = urlsplit(exchange["url"])
+                key = _playback_key(
+                    exchange["method"], f"/{parts.netloc}{parts.path}", parts.query, exchange.get("request_body")
+                )
+                self.exchanges[key].append(exchange)
+
+    def next_exchange(self, key):
+        with self.lock:
+            if not self.exchanges[key]:
+                self.misses += 1
+                return None
+            return self.exchanges[key].popleft()
+
+
+class PlaybackHandler(BaseHTTPRequestHandler):
+
+    def _play(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+
+        parts = urlsplit(redact_url(self.path))
+        body = redact_body(self.headers.get("Content-Type", ""), body)
+        exchange = self.server.next_exchange(_playback_key(self.command, parts.path, parts.query, body))
+        if exchange is None:
+            self._send(404, "application/json", json.dumps({"error": "No recorded upstream response"}))
+            return
+
+        if self.server.honor_latency:
+            time.sleep(exchange["elapsed_ms"] / 1000)
+
+        body = exchange["body"] if exchange["body_format"] == "text" else json.dumps(exchange["body"])
+        self._send(exchange["status"], exchange["content_type"] or "application/json", body)
+
+    def _send(self, status, content_type, body):
+        payload = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = _play
+    do_POST = _play
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _replay_request(client, record):
+    path = record["path"]
+    extra = {"HTTP_AUTHORIZATION": REDACTED} if record["has_authorization"] else {}
+
+    if record["method"] == "GET":
+        return client.get(path, data=record["query"], **extra)
+
+    if record["query"]:
+        path = f"{path}?{urlencode(record['query'])}"
+
+    if record["body_format"] == "form":
+        if record["content_type"] == "multipart/form-data":
+            data = dict(record["body"])
+            for name, upload in record["files"].items():
+                data[name] = SimpleUploadedFile(upload["name"], b"\0" * upload["size"], upload["content_type"])
+            return client.post(path, data=data, **extra)
+        return client.post(path, data=urlencode(record["body"]), content_type=record["content_type"], **extra)
+
+    if record["body_format"] == "json":
+        body = json.dumps(record["body"])
+    else:
+        body = record["body"] or ""
+    return client.generic(record["method"], path, data=body, content_type=record["content_type"], **extra)
+
+
+def _response_body(response):
+    # ✅ Redacted like the capture, so recorded and replayed bodies compare equal
+    if not response.get("Content-Type", "").startswith("application/json"):
+        return None
+    try:
+        return redact(json.loads(response.content))
+    except ValueError:
+        return None
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = "Replays a traffic capture against the proxy with upstreams played back from the recording."
+
+    def add_arguments(self, parser):
+        parser.add_argument("capture_file", help="Capture written by TrafficCaptureMiddleware (TRAFFIC_CAPTURE_FILE)")
+        parser.add_argument("--concurrency", type=int, default=1, help="Parallel replay clients (1 keeps replay deterministic)")
+        parser.add_argument("--no-latency", action="store_true", help="Serve upstream responses without recorded latency")
+
+    def handle(self, *args, **options):
+        try:
+            records = list(read_capture(options["capture_file"]))
+        except OSError as e:
+            raise CommandError(f"Could not read capture: {e}")
+        if not records:
+            raise CommandError("Capture file contains no records")
+
+        # ✅ Async profile updates were answered 202 without an upstream call and would only write
+        # ProfileUpdateJob rows to the live DB; replay runs every profile update synchronously instead
+        replayable = []
+        for record in records:
+            if record["route"] != "update_member_profile" or record["status"] != 202:
+                replayable.append(record)
+        if len(replayable) < len(records):
+            self.stdout.write(self.style.WARNING(f"Skipping {len(records) - len(replayable)} async profile updates"))
+            records = replayable
+
+        server = PlaybackServer(records, honor_latency=not options["no_latency"])
+        threading.Thread(target=server.serve_forever, name="replay-playback", daemon=True).start()
+        playback_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        originals = []
+
+        def patch(module, attribute, value):
+            originals.append((module, attribute, getattr(module, attribute)))
+            setattr(module, attribute, value)
+
+        # ✅ Point every upstream at the playback server for the duration of the replay
+        for module_name, attribute in UPSTREAM_URLS:
+            module = importlib.import_module(module_name)
+            parts = urlsplit(getattr(module, attribute))
+            patch(module, attribute, f"{playback_url}/{parts.netloc}{parts.path}")
+
+        # ✅ Keep replayed traffic out of the production popularity file, and disable prefetch:
+        # its upstream calls run off the request thread, so they were never captured
+        atexit.unregister(fatsecret_cache.save_popularity)
+        patch(fatsecret_cache, "record_hit", lambda method_path, params: None)
+        patch(fatsecret_cache, "FATSECRET_PREFETCH_TOP_N", 0)
+        patch(gymmaster_update_profile_view, "_wants_async", lambda request: False)
+        # ✅ Read when each Client builds its middleware chain, so replayed requests are never
+        # appended to a live capture configured through the environment
+        patch(traffic_capture, "TRAFFIC_CAPTURE_FILE", None)
+
+        cache.clear()
+        clear_cached_token()
+        self.stdout.write(f"Replaying {len(records)} requests against {playback_url} ...")
+
+        def replay(record):
+            client = Client(HTTP_HOST="localhost")
+            started = time.perf_counter()
+            response = _replay_request(client, record)
+            duration_ms = (time.perf_counter() - started) * 1000
+            return record, response.status_code, _response_body(response), duration_ms
+
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+                results = list(executor.map(replay, records))
+        finally:
+            for module, attribute, original in originals:
+                setattr(module, attribute, original)
+            server.shutdown()
+        wall_seconds = time.perf_counter() - started
+
+        self._report(results, wall_seconds, server.misses)
+
+    def _report(self, results, wall_seconds, misses):
+        by_route = defaultdict(list)
+        mismatches = 0
+        body_mismatches = 0
+        for record, status, body, duration_ms in results:
+            by_route[record["route"]].append((record, duration_ms))
+            if status != record["status"]:
+                mismatches += 1
+            # ✅ Only JSON responses were kept in the capture (and older captures have none)
+            elif record.get("response_format") == "json" and body != record["response_body"]:
+                body_mismatches += 1
+
+        self.stdout.write(f"{'route':<24}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'recorded p50':>14}")
+        for route, entries in sorted(by_route.items()):
+            durations = [duration_ms for _, duration_ms in entries]
+            recorded = [record["duration_ms"] for record, _ in entries]
+            self.stdout.write(
+                f"{route:<24}{len(durations):>7}"
+                f"{_percentile(durations, 50):>10.1f}{_percentile(durations, 95):>10.1f}{_percentile(durations, 99):>10.1f}"
+                f"{statistics.median(recorded):>14.1f}"
+            )
+
+        self.stdout.write(f"Total: {len(results)} requests in {wall_seconds:.2f}s ({len(results) / wall_seconds:.1f} req/s)")
+        self.stdout.write(f"Status mismatches vs recording: {mismatches}")
+        self.stdout.write(f"Body mismatches vs recording: {body_mismatches}")
+        self.stdout.write(f"Upstream calls with no recording: {misses}")
+        if mismatches or body_mismatches or misses:
+            self.stdout.write(self.style.WARNING("Replay diverged from the recording"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Replay matched the recording"))
@@ -0,0 +1,31 @@
+import uuid
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileUpdateJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='pending', max_length=16)),
+                ('form_data', models.JSONField(default=dict)),
+                ('photo_name', models.CharField(blank=True, max_length=255)),
+                ('photo_content_type', models.CharField(blank=True, max_length=100)),
+                ('photo', models.BinaryField(null=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('response_status', models.PositiveIntegerField(null=True)),
+                ('response_body', models.JSONField(null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,39 @@
+import uuid
+from django.db import models
+
+
+class ProfileUpdateJob(models.Model):
+    """
+    A member profile update accepted with 202 and forwarded to GymMaster in the background.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_SUCCEEDED, "Succeeded"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING)
+
+    # Request as received from the client (without our API key); cleared once the job finishes
+    form_data = models.JSONField(default=dict)
+    photo_name = models.CharField(max_length=255, blank=True)
+    photo_content_type = models.CharField(max_length=100, blank=True)
+    photo = models.BinaryField(null=True)
+
+    attempts = models.PositiveIntegerField(default=0)
+    response_status = models.PositiveIntegerField(null=True)
+    response_body = models.JSONField(null=True)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"ProfileUpdateJob {self.id} ({self.status})"
@@ -0,0 +1,181 @@
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+from django.db import DatabaseError, connection
+from django.utils import timezone
+from dotenv import load_dotenv
+from .models import ProfileUpdateJob
+
+# ✅ Load environment variables
+load_dotenv()
+
+GYMMASTER_PROFILE_UPDATE_WORKERS = int(os.getenv("GYMMASTER_PROFILE_UPDATE_WORKERS", "4"))
+GYMMASTER_PROFILE_UPDATE_MAX_ATTEMPTS = int(os.getenv("GYMMASTER_PROFILE_UPDATE_MAX_ATTEMPTS", "3"))
+GYMMASTER_PROFILE_UPDATE_RETRY_BACKOFF = float(os.getenv("GYMMASTER_PROFILE_UPDATE_RETRY_BACKOFF", "2"))  # Seconds, doubled per retry
+
+# ✅ A job untouched for longer than every attempt's 15s timeout plus all backoff (and a margin)
+# belongs to a worker that died; it is requeued
+GYMMASTER_PROFILE_UPDATE_LEASE = float(os.getenv(
+    "GYMMASTER_PROFILE_UPDATE_LEASE",
+    str(
+        GYMMASTER_PROFILE_UPDATE_MAX_ATTEMPTS * 15
+        + GYMMASTER_PROFILE_UPDATE_RETRY_BACKOFF * (2 ** (GYMMASTER_PROFILE_UPDATE_MAX_ATTEMPTS - 1) - 1)
+        + 60
+    ),
+))  # Seconds
+
+# ✅ Finished jobs hold GymMaster's response (member data), so they are deleted after this
+GYMMASTER_PROFILE_UPDATE_RETENTION_HOURS = float(os.getenv("GYMMASTER_PROFILE_UPDATE_RETENTION_HOURS", "24"))
+GYMMASTER_PROFILE_UPDATE_PURGE_INTERVAL = 3600  # Seconds between purges triggered by status polls
+
+# ✅ Setup logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=GYMMASTER_PROFILE_UPDATE_WORKERS, thread_name_prefix="profile-update")
+_last_purged_at = None
+
+
+def submit(job_id):
+    _executor.submit(_run_job, job_id)
+
+
+def _lease_cutoff():
+    return timezone.now() - timedelta(seconds=GYMMASTER_PROFILE_UPDATE_LEASE)
+
+
+def requeue_if_stale(job_id):
+    """
+    Moves a pending or running job whose lease expired back to pending and resubmits it.
+    Returns True if this call requeued the job.
+    """
+    requeued = ProfileUpdateJob.objects.filter(
+        pk=job_id,
+        status__in=[ProfileUpdateJob.STATUS_PENDING, ProfileUpdateJob.STATUS_RUNNING],
+        updated_at__lt=_lease_cutoff(),
+    ).update(status=ProfileUpdateJob.STATUS_PENDING, updated_at=timezone.now())
+    if requeued:
+        logger.warning("🔁 Requeued stale profile update job %s", job_id)
+        submit(job_id)
+    return bool(requeued)
+
+
+def purge_finished_jobs():
+    """
+    Deletes succeeded and failed jobs that finished more than the retention window ago.
+    Returns the number of jobs deleted.
+    """
+    global _last_purged_at
+    _last_purged_at = time.monotonic()
+
+    deleted, _ = ProfileUpdateJob.objects.filter(
+        status__in=[ProfileUpdateJob.STATUS_SUCCEEDED, ProfileUpdateJob.STATUS_FAILED],
+        updated_at__lt=timezone.now() - timedelta(hours=GYMMASTER_PROFILE_UPDATE_RETENTION_HOURS),
+    ).delete()
+    if deleted:
+        logger.info("🧹 Purged %d finished profile update jobs", deleted)
+    return deleted
+
+
+def purge_finished_jobs_if_due():
+    if _last_purged_at is None or time.monotonic() - _last_purged_at >= GYMMASTER_PROFILE_UPDATE_PURGE_INTERVAL:
+        purge_finished_jobs()
+
+
+def resume_pending_jobs():
+    """
+    Requeues jobs accepted before a restart, plus running jobs whose lease expired.
+    Claiming in _run_job keeps each job single-shot even when several workers resume at once.
+    Finished jobs past the retention window are purged first.
+    """
+    try:
+        purge_finished_jobs()
+
+        for job_id in ProfileUpdateJob.objects.filter(
+            status=ProfileUpdateJob.STATUS_RUNNING, updated_at__lt=_lease_cutoff()
+        ).values_list("id", flat=True):
+            requeue_if_stale(job_id)
+
+        job_ids = list(ProfileUpdateJob.objects.filter(status=ProfileUpdateJob.STATUS_PENDING).values_list("id", flat=True))
+    except DatabaseError:
+        logger.exception("🚨 Could not load pending profile update jobs")
+        return
+
+    for job_id in job_ids:
+        submit(job_id)
+    if job_ids:
+        logger.info("🔁 Resumed %d pending profile update jobs", len(job_ids))
+
+
+def _finish(job, status, response=None):
+    if response is not None:
+        try:
+            job.response_body = response.json()
+        except ValueError:
+            job.response_body = {"response": response.text}
+        job.response_status = response.status_code
+
+    job.status = status
+    # ✅ Drop the member's form data and photo once GymMaster has the final say
+    job.form_data = {}
+    job.photo = None
+    job.save()
+
+
+def _run_job(job_id):
+    from .gymmaster_update_profile_view import forward_profile_update
+
+    try:
+        claimed = ProfileUpdateJob.objects.filter(
+            pk=job_id, status=ProfileUpdateJob.STATUS_PENDING
+        ).update(status=ProfileUpdateJob.STATUS_RUNNING, updated_at=timezone.now())  # Starts the lease
+        if not claimed:
+            return
+
+        job = ProfileUpdateJob.objects.get(pk=job_id)
+        files = {}
+        if job.photo is not None:
+            files["memberphoto"] = (job.photo_name, bytes(job.photo), job.photo_content_type)
+
+        for attempt in range(1, GYMMASTER_PROFILE_UPDATE_MAX_ATTEMPTS + 1):
+            job.attempts = attempt
+            try:
+                response = forward_profile_update(job.form_data, files)
+            except requests.exceptions.RequestException as e:
+                logger.warning("🚨 Profile update job %s attempt %d failed: %s", job_id, attempt, e)
+                job.error = str(e)
+            else:
+                # ✅ Only throttling and server errors are worth retrying
+                if response.status_code != 429 and response.status_code < 500:
+                    job.error = ""
+                    _finish(job, ProfileUpdateJob.STATUS_SUCCEEDED if response.ok else ProfileUpdateJob.STATUS_FAILED, response)
+                    return
+                logger.warning("🚨 Profile update job %s attempt %d got %d", job_id, attempt, response.status_code)
+                job.error = f"GymMaster returned {response.status_code}"
+                if attempt == GYMMASTER_PROFILE_UPDATE_MAX_ATTEMPTS:
+                    _finish(job, ProfileUpdateJob.STATUS_FAILED, response)
+                    return
+
+            job.save(update_fields=["attempts", "error", "updated_at"])
+            if attempt < GYMMASTER_PROFILE_UPDATE_MAX_ATTEMPTS:
+                time.sleep(GYMMASTER_PROFILE_UPDATE_RETRY_BACKOFF * 2 ** (attempt - 1))
+
+        _finish(job, ProfileUpdateJob.STATUS_FAILED)
+
+    except DatabaseError:
+        logger.exception("🚨 Profile update job %s could not be processed", job_id)
+        # ✅ Hand the job back so requeue_if_stale can retry it once the lease expires
+        try:
+            ProfileUpdateJob.objects.filter(
+                pk=job_id, status=ProfileUpdateJob.STATUS_RUNNING
+            ).update(status=ProfileUpdateJob.STATUS_PENDING, updated_at=timezone.now())
+        except DatabaseError:
+            logger.exception("🚨 Could not release profile update job %s", job_id)
+
+    finally:
+        # ✅ Worker threads outlive requests, so close their DB connection explicitly
+        connection.close()
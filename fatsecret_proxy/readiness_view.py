@@ -0,0 +1,8 @@
+from django.http import JsonResponse
+from . import warmup
+
+def readiness(request):
+    """
+    Load balancer readiness probe: 503 until this worker has finished its startup warm-up.
+    """
+    return JsonResponse(warmup.status(), status=200 if warmup.is_ready() else 503)
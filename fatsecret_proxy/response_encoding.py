@@ -0,0 +1,94 @@
+import logging
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import patch_vary_headers
+
+# ✅ Setup logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# ✅ Binary encoders (listed in requirements.txt); responses fall back to JSON without them
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+    logger.warning("🚨 msgpack is not installed; MessagePack requests will be answered with JSON")
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+    logger.warning("🚨 cbor2 is not installed; CBOR requests will be answered with JSON")
+
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+CBOR_CONTENT_TYPE = "application/cbor"
+JSON_CONTENT_TYPE = "application/json"
+
+# ✅ Accept media types mapped to the encoding we answer with
+ACCEPTED_MEDIA_TYPES = {
+    "application/msgpack": MSGPACK_CONTENT_TYPE,
+    "application/x-msgpack": MSGPACK_CONTENT_TYPE,
+    "application/vnd.msgpack": MSGPACK_CONTENT_TYPE,
+    "application/cbor": CBOR_CONTENT_TYPE,
+    "application/json": JSON_CONTENT_TYPE,
+}
+
+
+def encode_msgpack(data):
+    return msgpack.packb(data, use_bin_type=True)
+
+
+def encode_cbor(data):
+    return cbor2.dumps(data)
+
+
+ENCODERS = {
+    MSGPACK_CONTENT_TYPE: (lambda: msgpack is not None, encode_msgpack),
+    CBOR_CONTENT_TYPE: (lambda: cbor2 is not None, encode_cbor),
+}
+
+
+def negotiate_content_type(accept_header):
+    """
+    Picks the highest-q supported media type the client named explicitly.
+    Wildcards never select a binary encoding; JSON is the fallback.
+    """
+    best_type, best_q = JSON_CONTENT_TYPE, 0.0
+    for item in accept_header.split(","):
+        media_type, _, params = item.strip().partition(";")
+        content_type = ACCEPTED_MEDIA_TYPES.get(media_type.strip().lower())
+        if content_type is None:
+            continue
+
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+
+        if q > best_q:
+            best_type, best_q = content_type, q
+
+    return best_type
+
+
+def proxy_response(request, data, status=200):
+    """
+    Returns proxied upstream data as JSON, MessagePack or CBOR depending on the Accept header.
+    Data is encoded straight from Python objects, never via an intermediate JSON string.
+    """
+    content_type = negotiate_content_type(request.headers.get("Accept", ""))
+
+    response = None
+    if content_type in ENCODERS:
+        available, encode = ENCODERS[content_type]
+        if available():
+            response = HttpResponse(encode(data), content_type=content_type, status=status)
+
+    if response is None:
+        response = JsonResponse(data, safe=False, status=status)
+
+    patch_vary_headers(response, ["Accept"])
+    return response
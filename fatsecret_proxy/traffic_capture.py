@@ -0,0 +1,280 @@
+import atexit
+import gzip
+import json
+import os
+import threading
+import time
+import logging
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from django.core.exceptions import MiddlewareNotUsed
+from dotenv import load_dotenv
+
+# ✅ Load environment variables
+load_dotenv()
+
+# ✅ Capture is enabled only when a target file is configured
+TRAFFIC_CAPTURE_FILE = os.getenv("TRAFFIC_CAPTURE_FILE")
+TRAFFIC_CAPTURE_FLUSH_EVERY = int(os.getenv("TRAFFIC_CAPTURE_FLUSH_EVERY", "50"))
+
+# ✅ Proxy views recorded at their boundary (URL names from fatsecret_proxy/urls.py)
+CAPTURED_ROUTES = {
+    "get_access_token",
+    "signup_member",
+    "login_with_email",
+    "login_with_memberid",
+    "update_member_profile",
+    "gatekeeper_proxy",
+    "gymmaster_proxy",
+    "fatsecret_proxy",
+}
+
+# ✅ Never written to disk
+REDACTED = "[REDACTED]"
+SECRET_FIELDS = {"password", "api_key", "client_secret", "access_token", "refresh_token", "token"}
+
+FORM_CONTENT_TYPES = ("multipart/form-data", "application/x-www-form-urlencoded")
+
+# ✅ Views that read request.POST; every other view reads request.body, which Django
+# refuses to hand out once a multipart POST has been parsed
+FORM_ROUTES = {
+    "signup_member",
+    "login_with_email",
+    "login_with_memberid",
+    "update_member_profile",
+}
+
+# ✅ Setup logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+_buffer = []
+_buffer_lock = threading.Lock()
+_original_send = requests.Session.send
+
+
+def redact(value):
+    """
+    Recursively replaces secret fields in JSON-like data.
+    """
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if str(key).lower() in SECRET_FIELDS else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+def redact_url(url):
+    parts = urlsplit(url)
+    query = [
+        (key, REDACTED if key.lower() in SECRET_FIELDS else value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+    ]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def redact_body(content_type, body):
+    """
+    Returns a redacted JSON or urlencoded form body as data, or None for any other body.
+    """
+    if not isinstance(body, (bytes, str)) or not body:
+        return None
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type == "application/json":
+        try:
+            return redact(json.loads(body))
+        except ValueError:
+            return None
+    if media_type == "application/x-www-form-urlencoded":
+        return redact(dict(parse_qsl(body, keep_blank_values=True)))
+    return None
+
+
+def _recording_send(session, prepared_request, **kwargs):
+    """
+    Wraps requests' Session.send to time upstream calls made while a captured view runs.
+    """
+    exchanges = getattr(_local, "exchanges", None)
+    if exchanges is None:
+        return _original_send(session, prepared_request, **kwargs)
+
+    started = time.perf_counter()
+    response = _original_send(session, prepared_request, **kwargs)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    try:
+        body = redact(response.json())
+        body_format = "json"
+    except ValueError:
+        body = response.text
+        body_format = "text"
+
+    exchanges.append({
+        "method": prepared_request.method,
+        "url": redact_url(prepared_request.url),
+        "request_body": redact_body(prepared_request.headers.get("Content-Type", ""), prepared_request.body),
+        "status": response.status_code,
+        "content_type": response.headers.get("Content-Type", ""),
+        "body_format": body_format,
+        "body": body,
+        "elapsed_ms": round(elapsed_ms, 2),
+    })
+    return response
+
+
+def _write_records(records):
+    # ✅ One gzip member per flush, appended in a single write so workers can share a file
+    payload = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records)
+    fd = os.open(TRAFFIC_CAPTURE_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+    try:
+        os.write(fd, gzip.compress(payload.encode()))
+    finally:
+        os.close(fd)
+
+
+def flush():
+    with _buffer_lock:
+        records = list(_buffer)
+        _buffer.clear()
+    if not records:
+        return
+
+    try:
+        _write_records(records)
+    except OSError:
+        logger.exception("🚨 Could not write traffic capture: %s", TRAFFIC_CAPTURE_FILE)
+
+
+def read_capture(path):
+    """
+    Yields captured records in the order they were written.
+    """
+    with gzip.open(path, "rt") as fp:
+        for line in fp:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _reads_form(request):
+    # ✅ gymmaster_proxy reads request.body for JSON and request.POST for anything else
+    if request.resolver_match.url_name == "gymmaster_proxy":
+        return "application/json" not in request.headers.get("Content-Type", "")
+    return request.resolver_match.url_name in FORM_ROUTES
+
+
+def _capture_request(request):
+    content_type = request.content_type or ""
+    record = {
+        "method": request.method,
+        "path": request.path,
+        "query": redact(request.GET.dict()),
+        "content_type": content_type,
+        "has_authorization": "Authorization" in request.headers,
+        "body_format": None,
+        "body": None,
+        "files": {},
+    }
+
+    if request.method != "POST":
+        return record
+
+    if content_type in FORM_CONTENT_TYPES and _reads_form(request):
+        # ✅ Parsing here leaves request.POST/FILES ready for the view
+        record["body"] = redact(request.POST.dict())
+        record["body_format"] = "form"
+        record["files"] = {
+            name: {"name": upload.name, "size": upload.size, "content_type": upload.content_type}
+            for name, upload in request.FILES.items()
+        }
+    elif content_type == "multipart/form-data":
+        pass  # Not read by the view; the raw body may hold unredacted fields, so it is not kept
+    elif content_type == "application/x-www-form-urlencoded":
+        # ✅ Read through request.body so a view that wants the raw body can still have it
+        record["body"] = redact_body(content_type, request.body)
+        record["body_format"] = "form"
+    else:
+        try:
+            record["body"] = redact(json.loads(request.body))
+            record["body_format"] = "json"
+        except ValueError:
+            record["body"] = request.body.decode("utf-8", errors="replace")
+            record["body_format"] = "text"
+
+    return record
+
+
+def _capture_response(response):
+    """
+    Returns (format, body) for the proxy's own response; binary encodings are not kept.
+    """
+    if response.streaming:
+        return None, None
+
+    content_type = response.get("Content-Type", "")
+    if content_type.startswith("application/json"):
+        try:
+            return "json", redact(json.loads(response.content))
+        except ValueError:
+            pass
+    if content_type.startswith(("application/json", "text/")):
+        return "text", response.content.decode("utf-8", errors="replace")
+    return None, None
+
+
+class TrafficCaptureMiddleware:
+    """
+    Records proxied requests, their upstream exchanges and timings to TRAFFIC_CAPTURE_FILE
+    (gzipped JSON lines) for offline replay with `manage.py replay_traffic`.
+    """
+
+    def __init__(self, get_response):
+        if not TRAFFIC_CAPTURE_FILE:
+            raise MiddlewareNotUsed("TRAFFIC_CAPTURE_FILE is not set")
+
+        self.get_response = get_response
+        requests.Session.send = _recording_send
+        atexit.register(flush)
+        logger.info("🎥 Capturing proxied traffic to %s", TRAFFIC_CAPTURE_FILE)
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            exchanges = getattr(_local, "exchanges", None)
+            _local.exchanges = None
+
+        record = getattr(request, "_traffic_capture", None)
+        if record is None:
+            return response
+
+        record["route"] = request.resolver_match.url_name
+        record["ts"] = time.time()
+        record["status"] = response.status_code
+        record["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        record["response_format"], record["response_body"] = _capture_response(response)
+        record["upstream"] = exchanges or []
+
+        with _buffer_lock:
+            _buffer.append(record)
+            flush_due = len(_buffer) >= TRAFFIC_CAPTURE_FLUSH_EVERY
+        if flush_due:
+            flush()
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.resolver_match.url_name not in CAPTURED_ROUTES:
+            return None
+
+        request._traffic_capture = _capture_request(request)
+        _local.exchanges = []
+        return None
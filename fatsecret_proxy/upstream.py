@@ -0,0 +1,74 @@
+import importlib
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+# ✅ Load environment variables
+load_dotenv()
+
+UPSTREAM_POOL_SIZE = int(os.getenv("UPSTREAM_POOL_SIZE", "20"))  # Kept-alive connections per upstream host
+UPSTREAM_WARM_CONNECTIONS = int(os.getenv("UPSTREAM_WARM_CONNECTIONS", "2"))  # Opened per host at startup
+UPSTREAM_WARM_TIMEOUT = float(os.getenv("UPSTREAM_WARM_TIMEOUT", "5"))  # Seconds
+
+# ✅ Module-level upstream URLs used by the proxy views
+UPSTREAM_URLS = [
+    ("fatsecret_proxy.views", "FATSECRET_BASE_URL"),
+    ("fatsecret_proxy.auth_view", "FATSECRET_OAUTH_URL"),
+    ("fatsecret_proxy.gymmaster_gatekeeper_view", "GM_GATEKEEPER_BASE_URL"),
+    ("fatsecret_proxy.gymmaster_login_view", "GYMMASTER_LOGIN_URL"),
+    ("fatsecret_proxy.gymmaster_proxy_view", "GYMMASTER_BASE_URL"),
+    ("fatsecret_proxy.gymmaster_signup_view", "GYMMASTER_SIGNUP_URL"),
+    ("fatsecret_proxy.gymmaster_update_profile_view", "GYMMASTER_PROFILE_UPDATE_URL"),
+]
+
+# ✅ Setup logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# ✅ Shared keep-alive session so DNS, TCP and TLS setup is paid once per connection, not per request
+session = requests.Session()
+session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))  # Never share upstream cookies between clients
+_adapter = HTTPAdapter(pool_connections=len(UPSTREAM_URLS), pool_maxsize=UPSTREAM_POOL_SIZE)
+session.mount("https://", _adapter)
+session.mount("http://", _adapter)
+
+
+def upstream_origins():
+    """
+    Returns the distinct scheme://host origins the proxy talks to.
+    """
+    origins = []
+    for module_name, attribute in UPSTREAM_URLS:
+        parts = urlsplit(getattr(importlib.import_module(module_name), attribute))
+        origin = f"{parts.scheme}://{parts.netloc}"
+        if origin not in origins:
+            origins.append(origin)
+    return origins
+
+
+def _open_connection(origin):
+    # ✅ Any response will do; the point is leaving a TLS connection in the pool
+    session.head(f"{origin}/", timeout=UPSTREAM_WARM_TIMEOUT, allow_redirects=False)
+
+
+def warm_connections():
+    """
+    Pre-opens UPSTREAM_WARM_CONNECTIONS pooled connections to every upstream host, so DNS,
+    TCP and TLS setup happen before traffic arrives. Returns a list of origins that failed to warm.
+    """
+    failed = []
+    for origin in upstream_origins():
+        try:
+            with ThreadPoolExecutor(max_workers=UPSTREAM_WARM_CONNECTIONS) as executor:
+                list(executor.map(_open_connection, [origin] * UPSTREAM_WARM_CONNECTIONS))
+            logger.debug("🔌 Warmed %d connections to %s", UPSTREAM_WARM_CONNECTIONS, origin)
+        except requests.exceptions.RequestException:
+            logger.exception("🚨 Could not warm connections to %s", origin)
+            failed.append(origin)
+    return failed
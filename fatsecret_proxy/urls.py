@@ -5,17 +5,22 @@ from .gymmaster_gatekeeper_view import gatekeeper_proxy
 from .gymmaster_signup_view import signup_member
 from .gymmaster_login_view import login_with_email, login_with_memberid
 from .gymmaster_proxy_view import gymmaster_proxy
-from .gymmaster_update_profile_view import update_member_profile
+from .gymmaster_update_profile_view import update_member_profile, update_member_profile_status
+from .admission_view import admission_metrics
 
 urlpatterns = [
    # ✅ Authentication
    path('auth/token/', get_access_token, name='get_access_token'),
 
+   # ✅ Load shedding metrics
+   path('admission/metrics/', admission_metrics, name='admission_metrics'),
+
    # ✅ GymMaster API Endpoints
    path('gymmaster/signup/', signup_member, name='signup_member'),
    path('gymmaster/login/email/', login_with_email, name='login_with_email'),
    path('gymmaster/login/memberid/', login_with_memberid, name='login_with_memberid'),
    path('gymmaster/member/update/profile/', update_member_profile, name='update_member_profile'),
+   path('gymmaster/member/update/profile/status/<uuid:job_id>/', update_member_profile_status, name='update_member_profile_status'),
    re_path(r'^gymmaster/gatekeeper/(?P<path>.*)/$', gatekeeper_proxy, name='gatekeeper_proxy'), 
    re_path(r'^gymmaster/(?P<path>.*)/$', gymmaster_proxy, name='gymmaster_proxy'),
     # ✅ Dynamic API Proxy
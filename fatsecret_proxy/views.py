@@ -3,8 +3,13 @@ import os
 import json
 import logging
 from django.http import JsonResponse
+from django.utils.cache import patch_vary_headers
 from django.views.decorators.csrf import csrf_exempt
 from dotenv import load_dotenv
+from . import fatsecret_cache
+from .field_projection import resolve_projection
+from . import upstream
+from .response_encoding import proxy_response
 
 # Load environment variables
 load_dotenv()
@@ -43,10 +48,35 @@ def fatsecret_proxy(request, method_path):
     params = request.GET.dict()
     params["format"] = "json"  # Ensure JSON response
 
+    # ✅ Field projection is applied here, never forwarded to FatSecret or part of the cache key
+    fields = params.pop("fields", None)
+    profile = params.pop("profile", None) or request.headers.get("X-Response-Profile")
+    try:
+        project = resolve_projection(fields, profile)
+    except KeyError:
+        logger.error(f"🚨 Unknown response profile: {profile}")
+        return JsonResponse({"error": f"Unknown response profile: {profile}"}, status=400)
+    except ValueError as e:
+        logger.error(f"🚨 Invalid fields projection: {e}")
+        return JsonResponse({"error": str(e)}, status=400)
+
+    def respond(data):
+        response = proxy_response(request, project(data) if project else data)
+        # ✅ The body also depends on the profile header
+        patch_vary_headers(response, ["X-Response-Profile"])
+        return response
+
     # ✅ Handle GET Requests
     try:
         if request.method == "GET":
-            response = requests.get(fatsecret_url, params=params, headers=headers)
+            # ✅ Serve popular/prefetched FatSecret data from cache
+            cached_data = fatsecret_cache.get_cached(method_path, params)
+            if cached_data is not None:
+                logger.debug(f"⚡ FatSecret cache hit: {method_path}")
+                fatsecret_cache.record_hit(method_path, params)
+                return respond(cached_data)
+
+            response = upstream.session.get(fatsecret_url, params=params, headers=headers)
 
         # ✅ Handle POST Requests
         elif request.method == "POST":
@@ -57,7 +87,7 @@ def fatsecret_proxy(request, method_path):
                 return JsonResponse({"error": "Invalid JSON data"}, status=400)
 
             logger.debug(f"📦 Request Body: {body_data}")  # Log request body
-            response = requests.post(fatsecret_url, json=body_data, headers=headers,timeout=20,allow_redirects=False)  # ✅ Prevents unexpected redirects)
+            response = upstream.session.post(fatsecret_url, json=body_data, headers=headers,timeout=20,allow_redirects=False)  # ✅ Prevents unexpected redirects)
 
         else:
             return JsonResponse({"error": "Only GET and POST requests are allowed"}, status=405)
@@ -76,7 +106,14 @@ def fatsecret_proxy(request, method_path):
                
             }, status=response.status_code)
 
-        return JsonResponse(response.json(), safe=False)
+        response_data = response.json()
+        # ✅ Error objects can arrive with HTTP 200; never cache or count them as popular
+        if request.method == "GET" and not fatsecret_cache.is_error_payload(response_data):
+            fatsecret_cache.record_hit(method_path, params)
+            fatsecret_cache.store(method_path, params, response_data)
+            fatsecret_cache.prefetch_search_results(method_path, response_data, access_token)
+
+        return respond(response_data)
 
     except requests.exceptions.RequestException as e:
         logger.exception("🚨 Request to FatSecret failed")
@@ -0,0 +1,56 @@
+import threading
+import time
+import logging
+from . import fatsecret_cache, profile_update_jobs, upstream
+from .auth_view import prefetch_access_token
+
+# ✅ Setup logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+_ready = threading.Event()
+_status = {
+    "started_at": None,
+    "finished_at": None,
+    "failed_upstreams": [],
+    "token_prefetched": False,
+}
+_started = False
+_start_lock = threading.Lock()
+
+
+def is_ready():
+    return _ready.is_set()
+
+
+def status():
+    return {"ready": is_ready(), **_status}
+
+
+def run_warmup():
+    """
+    Opens upstream connections and fetches the FatSecret token, then marks the worker ready.
+    Pending profile updates are resumed and popular FatSecret responses warmed afterwards,
+    without holding back readiness.
+    """
+    _status["started_at"] = time.time()
+    try:
+        _status["failed_upstreams"] = upstream.warm_connections()
+        _status["token_prefetched"] = prefetch_access_token()
+    finally:
+        # ✅ Failed steps are reported by /ready but never keep the worker out of rotation
+        _status["finished_at"] = time.time()
+        _ready.set()
+        logger.info("✅ Worker warm-up finished in %.2fs", _status["finished_at"] - _status["started_at"])
+
+    profile_update_jobs.resume_pending_jobs()
+    fatsecret_cache.warm_cache()
+
+
+def start_warmup():
+    global _started
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+    threading.Thread(target=run_warmup, name="worker-warmup", daemon=True).start()